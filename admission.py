@@ -0,0 +1,189 @@
+"""
+Admission control for database-backed routes
+Limits concurrent database work and sheds load when the database slows down
+"""
+
+import threading
+import time
+import logging
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Budget and queue deadline of the request being served on this thread
+_admitted = threading.local()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within its budget"""
+
+    def __init__(self, budget, reason, retry_after):
+        super().__init__(f"Database busy ({budget} budget: {reason}), retry after {retry_after}s")
+        self.budget = budget
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Budget:
+    """Concurrency limit with a bounded wait queue for one class of requests"""
+
+    def __init__(self, name, limit, queue_size, queue_timeout, retry_after):
+        """Initialize budget limits and metrics"""
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+        # Metrics
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rejected_database_busy = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    def acquire(self):
+        """Take a slot, waiting in the queue up to queue_timeout if the budget is full
+
+        Returns the request's queue deadline (time.monotonic() based), which
+        also bounds its wait for the database connection.
+        """
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        with self._condition:
+            # Fast path: free slot and nobody queued ahead of us
+            if self.active < self.limit and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return deadline
+
+            if self.waiting >= self.queue_size:
+                self.rejected_queue_full += 1
+                logger.warning(f"Rejected {self.name} request: queue full ({self.waiting} waiting)")
+                raise AdmissionRejected(self.name, 'queue full', self.retry_after)
+
+            self.waiting += 1
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_timeout += 1
+                        logger.warning(f"Rejected {self.name} request: queue timeout after {self.queue_timeout}s")
+                        raise AdmissionRejected(self.name, 'queue timeout', self.retry_after)
+                    self._condition.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+                return deadline
+            finally:
+                # Queue time covers requests that timed out as well as admitted ones
+                self.waiting -= 1
+                waited = time.monotonic() - start
+                self.queued += 1
+                self.queue_time_total += waited
+                self.queue_time_max = max(self.queue_time_max, waited)
+
+    def acquire_lock(self, lock, deadline):
+        """Acquire lock before deadline, rejecting the request if it is still held"""
+        if lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            return
+        with self._condition:
+            self.rejected_database_busy += 1
+        logger.warning(f"Rejected {self.name} request: database busy after {self.queue_timeout}s")
+        raise AdmissionRejected(self.name, 'database busy', self.retry_after)
+
+    def release(self):
+        """Return a slot and wake the next queued request"""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def metrics(self):
+        """Snapshot of budget state and counters"""
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'queue_size': self.queue_size,
+                'queue_timeout': self.queue_timeout,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_timeout': self.rejected_timeout,
+                'rejected_database_busy': self.rejected_database_busy,
+                'rejected_total': self.rejected_queue_full + self.rejected_timeout + self.rejected_database_busy,
+                'queue_time_total': round(self.queue_time_total, 6),
+                'queue_time_avg': round(self.queue_time_total / self.queued, 6) if self.queued else 0.0,
+                'queue_time_max': round(self.queue_time_max, 6)
+            }
+
+
+class AdmissionController:
+    """Separate read and write budgets guarding database-backed routes"""
+
+    def __init__(self, budgets):
+        """Initialize controller with a mapping of budget name to Budget"""
+        self.budgets = budgets
+
+    @classmethod
+    def from_config(cls, config):
+        """Build read/write budgets from application config"""
+        queue_timeout = config['DB_QUEUE_TIMEOUT']
+        retry_after = config['DB_RETRY_AFTER']
+        return cls({
+            'read': Budget('read', config['DB_READ_CONCURRENCY'], config['DB_READ_QUEUE_SIZE'],
+                           queue_timeout, retry_after),
+            'write': Budget('write', config['DB_WRITE_CONCURRENCY'], config['DB_WRITE_QUEUE_SIZE'],
+                            queue_timeout, retry_after)
+        })
+
+    def limit(self, budget_name):
+        """Decorator admitting a view through the named budget"""
+        budget = self.budgets[budget_name]
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                _admitted.deadline = budget.acquire()
+                _admitted.budget = budget
+                _admitted.rejection = None
+                try:
+                    response = view(*args, **kwargs)
+                finally:
+                    _admitted.budget = None
+                    budget.release()
+                # Views turn any exception into a 500, so re-raise a
+                # rejection they caught to get the 503 + Retry-After response
+                if _admitted.rejection is not None:
+                    raise _admitted.rejection
+                return response
+            return wrapper
+        return decorator
+
+    def metrics(self):
+        """Snapshot of all budgets"""
+        return {name: budget.metrics() for name, budget in self.budgets.items()}
+
+
+def acquire_database_lock(lock):
+    """Acquire the backend's connection lock for the current request
+
+    Admitted requests wait only until their queue deadline and are then
+    rejected like a request that timed out in the queue. Work outside
+    admission control (CLI commands, health checks) waits indefinitely.
+    """
+    budget = getattr(_admitted, 'budget', None)
+    if budget is None:
+        lock.acquire()
+        return
+    try:
+        budget.acquire_lock(lock, _admitted.deadline)
+    except AdmissionRejected as e:
+        _admitted.rejection = e
+        raise
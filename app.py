@@ -3,12 +3,37 @@ Ryde University Student Records Web Application
 Flask-based web application for managing student records
 """
 
+import click
 from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from database import Database
 import os
 from config import Config
+from admission import AdmissionController, AdmissionRejected
+from rows import RowSetJSONEncoder, record_default
+from backend import StudentArchived
+from queries import STUDENT_FIELDS
+from archive import Archiver
+
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes database RowSet/Record results"""
+
+    @staticmethod
+    def default(o):
+        try:
+            return record_default(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj, writing RowSet results a chunk of rows at a time"""
+        kwargs.setdefault('cls', RowSetJSONEncoder)
+        return super().dumps(obj, **kwargs)
+
 
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
 app.config.from_object(Config)
 
 # Initialize database connection
@@ -16,10 +41,29 @@ db = Database(
     host=app.config['DB_HOST'],
     user=app.config['DB_USER'],
     password=app.config['DB_PASSWORD'],
-    database=app.config['DB_NAME']
+    database=app.config['DB_NAME'],
+    statement_cache_size=app.config['DB_STATEMENT_CACHE_SIZE'],
+    ping_interval=app.config['DB_PING_INTERVAL']
 )
 
+# Admission control - separate read/write budgets in front of the database
+admission = AdmissionController.from_config(app.config)
+
+def include_archived():
+    """True when the request opts in to archived records with ?include_archived=1"""
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+def missing_student_field(data):
+    """Return the first required student field missing from data, if any"""
+    if not isinstance(data, dict):
+        data = {}
+    for field in STUDENT_FIELDS:
+        if field not in data or not data[field]:
+            return field
+    return None
+
 @app.route('/')
+@admission.limit('read')
 def index():
     """Home page - Display all students"""
     try:
@@ -29,6 +73,7 @@ def index():
         return render_template('error.html', error=str(e)), 500
 
 @app.route('/students')
+@admission.limit('read')
 def students_list():
     """Students list page - Display all students"""
     try:
@@ -38,19 +83,21 @@ def students_list():
         return render_template('error.html', error=str(e)), 500
 
 @app.route('/api/students', methods=['GET'])
+@admission.limit('read')
 def api_get_students():
-    """API endpoint to get all students"""
+    """API endpoint to get all students (?include_archived=1 adds archived records)"""
     try:
-        students = db.get_all_students()
+        students = db.get_all_students(include_archived=include_archived())
         return jsonify({'success': True, 'data': students})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/students/<int:student_id>', methods=['GET'])
+@admission.limit('read')
 def api_get_student(student_id):
-    """API endpoint to get a specific student"""
+    """API endpoint to get a specific student (?include_archived=1 also checks the archive)"""
     try:
-        student = db.get_student_by_id(student_id)
+        student = db.get_student_by_id(student_id, include_archived=include_archived())
         if student:
             return jsonify({'success': True, 'data': student})
         else:
@@ -59,16 +106,16 @@ def api_get_student(student_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/students', methods=['POST'])
+@admission.limit('write')
 def api_add_student():
     """API endpoint to add a new student"""
     try:
         data = request.get_json()
         
         # Validate required fields
-        required_fields = ['name', 'address', 'city', 'state', 'email', 'phone']
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+        field = missing_student_field(data)
+        if field:
+            return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
         
         student_id = db.add_student(
             name=data['name'],
@@ -80,20 +127,22 @@ def api_add_student():
         )
         
         return jsonify({'success': True, 'message': 'Student added successfully', 'id': student_id}), 201
+    except StudentArchived as e:
+        return jsonify({'success': False, 'error': str(e), 'archived_id': e.student_id}), 409
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/students/<int:student_id>', methods=['PUT'])
+@admission.limit('write')
 def api_update_student(student_id):
     """API endpoint to update a student"""
     try:
         data = request.get_json()
         
         # Validate required fields
-        required_fields = ['name', 'address', 'city', 'state', 'email', 'phone']
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+        field = missing_student_field(data)
+        if field:
+            return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
         
         success = db.update_student(
             student_id=student_id,
@@ -109,10 +158,61 @@ def api_update_student(student_id):
             return jsonify({'success': True, 'message': 'Student updated successfully'})
         else:
             return jsonify({'success': False, 'error': 'Student not found'}), 404
+    except StudentArchived as e:
+        return jsonify({'success': False, 'error': str(e), 'archived_id': e.student_id}), 409
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/students/by-email', methods=['PUT'])
+@admission.limit('write')
+def api_upsert_student():
+    """API endpoint to insert or update a student by email (idempotent)"""
+    try:
+        data = request.get_json()
+        
+        field = missing_student_field(data)
+        if field:
+            return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+        
+        result, student_id = db.upsert_student(**{f: data[f] for f in STUDENT_FIELDS})
+        
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+        counts[result] = 1
+        if result == 'archived':
+            return jsonify({'success': False, 'error': f"Student with email {data['email']} is archived",
+                            'result': result, 'id': student_id, **counts}), 409
+        status = 201 if result == 'inserted' else 200
+        return jsonify({'success': True, 'result': result, 'id': student_id, **counts}), status
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/students/by-email/batch', methods=['PUT'])
+@admission.limit('write')
+def api_upsert_students():
+    """API endpoint to insert or update a batch of students by email"""
+    try:
+        data = request.get_json()
+        students = data.get('students') if isinstance(data, dict) else data
+        
+        if not isinstance(students, list):
+            return jsonify({'success': False, 'error': 'Expected a list of students'}), 400
+        if len(students) > app.config['SYNC_BATCH_MAX_SIZE']:
+            return jsonify({'success': False,
+                            'error': f"Batch too large (max {app.config['SYNC_BATCH_MAX_SIZE']} students)"}), 413
+        
+        for index, student in enumerate(students):
+            field = missing_student_field(student)
+            if field:
+                return jsonify({'success': False,
+                                'error': f'Student {index}: missing required field: {field}'}), 400
+        
+        counts = db.upsert_students(students)
+        return jsonify({'success': True, 'total': len(students), **counts})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/students/<int:student_id>', methods=['DELETE'])
+@admission.limit('write')
 def api_delete_student(student_id):
     """API endpoint to delete a student"""
     try:
@@ -129,12 +229,28 @@ def api_delete_student(student_id):
 def health_check():
     """Health check endpoint for load balancer"""
     try:
-        # Test database connection
-        db.get_connection().ping(reconnect=True)
+        # Test database connection (reconnects and drops stale prepared statements)
+        db.ping()
         return jsonify({'status': 'healthy', 'database': 'connected'}), 200
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 503
 
+@app.route('/metrics/admission')
+def admission_metrics():
+    """Admission control metrics (in-flight, queued, rejections, queue time)"""
+    return jsonify(admission.metrics()), 200
+
+@app.errorhandler(AdmissionRejected)
+def admission_rejected(error):
+    """503 handler - database budget exhausted, shed load instead of stalling workers"""
+    if request.path.startswith('/api/'):
+        response = jsonify({'success': False, 'error': str(error)})
+    else:
+        response = app.make_response(render_template('error.html', error='Service is busy, please try again shortly'))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
 @app.errorhandler(404)
 def not_found(error):
     """404 error handler"""
@@ -145,6 +261,23 @@ def internal_error(error):
     """500 error handler"""
     return render_template('error.html', error='Internal server error'), 500
 
+@app.cli.command('archive-students')
+@click.option('--max-age-days', type=int, default=None, help='Archive students created more than this many days ago')
+@click.option('--batch-size', type=int, default=None, help='Students moved per transaction')
+@click.option('--pause', type=float, default=None, help='Seconds to sleep between batches')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches (resume on next run)')
+def archive_students_command(max_age_days, batch_size, pause, max_batches):
+    """Move old student records into students_archive"""
+    archiver = Archiver(
+        db,
+        max_age_days=max_age_days if max_age_days is not None else app.config['ARCHIVE_MAX_AGE_DAYS'],
+        batch_size=batch_size or app.config['ARCHIVE_BATCH_SIZE'],
+        pause=pause if pause is not None else app.config['ARCHIVE_BATCH_PAUSE'],
+        max_batches=max_batches
+    )
+    moved = archiver.run()
+    click.echo(f"Archived {moved} students")
+
 if __name__ == '__main__':
     # Initialize database tables
     db.init_database()
@@ -0,0 +1,51 @@
+"""
+Hot/cold archival of old student records
+Moves students older than a configurable age from students into
+students_archive in small, rate-limited batches
+"""
+
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Archiver:
+    """Batch mover from the hot students table to students_archive
+
+    Each batch is its own transaction, so a run can be stopped at any point
+    (or hit max_batches) and the next run resumes with the oldest rows still
+    in the hot table. pause seconds between batches keep lock time and
+    replication lag low while the application is serving traffic.
+    """
+
+    def __init__(self, db, max_age_days, batch_size=500, pause=0.5, max_batches=None):
+        """Initialize archival settings"""
+        self.db = db
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.max_batches = max_batches
+
+    def cutoff(self):
+        """Oldest created_at kept in the hot table, as computed by the database"""
+        return self.db.archive_cutoff(self.max_age_days)
+
+    def run(self):
+        """Archive batches until none are left (or max_batches); return rows moved"""
+        # Fixed for the whole run so batches agree on what counts as old
+        cutoff = self.cutoff()
+        batches = 0
+        total = 0
+
+        logger.info(f"Archiving students created before {cutoff} in batches of {self.batch_size}")
+        while self.max_batches is None or batches < self.max_batches:
+            moved = self.db.archive_students(cutoff, self.batch_size)
+            batches += 1
+            total += moved
+            if moved < self.batch_size:
+                break
+            time.sleep(self.pause)
+
+        logger.info(f"Archived {total} students in {batches} batches")
+        return total
@@ -0,0 +1,289 @@
+"""
+Backend interface shared by the MySQL and SQLite database modules
+Student operations are written once here on top of a small set of
+statement primitives that each backend implements
+"""
+
+import threading
+import logging
+from abc import ABC, abstractmethod
+
+from admission import acquire_database_lock
+from queries import STUDENT_FIELDS
+from rows import RowSet
+
+logger = logging.getLogger(__name__)
+
+
+class StudentArchived(Exception):
+    """Raised when a new record would reuse the email of an archived student"""
+
+    def __init__(self, email, student_id):
+        super().__init__(f"Student with email {email} is archived (ID: {student_id})")
+        self.email = email
+        self.student_id = student_id
+
+
+class _Session:
+    """Context manager behind DatabaseBackend._session() (reentrant, reusable)"""
+
+    __slots__ = ('backend',)
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __enter__(self):
+        acquire_database_lock(self.backend._lock)
+        try:
+            self.backend.get_connection()
+        except BaseException:
+            self.backend._lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        self.backend._lock.release()
+
+
+class DatabaseBackend(ABC):
+    """Student record operations over a cached-statement backend
+
+    Subclasses provide get_connection(), close_connection(), ping(),
+    init_database(), transaction() and the _fetchall()/_execute()/_upsert() primitives.
+    Queries are looked up by name in self.queries, the catalog rendered for
+    the backend's paramstyle.
+    Read methods return rows.RowSet / rows.Record instead of dicts.
+    """
+
+    queries = {}
+
+    def __init__(self):
+        """Initialize shared backend state"""
+        # One connection is shared by all request threads, so operations are
+        # serialized: effective database concurrency is 1 per process, and
+        # admitted requests wait for it only until their queue deadline
+        self._lock = threading.RLock()
+        self._session_guard = _Session(self)
+
+    def _session(self):
+        """Serialize one operation and check the connection once for all its statements"""
+        return self._session_guard
+
+    @abstractmethod
+    def get_connection(self):
+        """Get database connection (create if doesn't exist)"""
+
+    @abstractmethod
+    def close_connection(self):
+        """Close database connection"""
+
+    @abstractmethod
+    def ping(self):
+        """Check the connection for health checks, reconnecting if it was lost"""
+
+    @abstractmethod
+    def init_database(self):
+        """Initialize database schema"""
+
+    @abstractmethod
+    def transaction(self):
+        """Context manager grouping the enclosed writes into one transaction"""
+
+    # The primitives below run inside _session() and use self.connection directly
+
+    @abstractmethod
+    def _fetchall(self, name, params=()):
+        """Run a cached SELECT and return (column_names, row_tuples)"""
+
+    @abstractmethod
+    def _execute(self, name, params=()):
+        """Run a cached write statement and return (rowcount, lastrowid)"""
+
+    @abstractmethod
+    def _upsert(self, values):
+        """Upsert one student by email, return ('inserted'|'updated'|'unchanged', id)"""
+
+    def get_all_students(self, include_archived=False):
+        """Retrieve all students from database (hot table unless include_archived)"""
+        try:
+            query = 'get_all_students_with_archived' if include_archived else 'get_all_students'
+            with self._session():
+                columns, rows = self._fetchall(query)
+            students = RowSet(columns, rows)
+
+            logger.info(f"Retrieved {len(students)} students")
+            return students
+        except Exception as e:
+            logger.error(f"Error retrieving students: {e}")
+            raise
+
+    def get_student_by_id(self, student_id, include_archived=False):
+        """Retrieve a specific student by ID (hot table unless include_archived)"""
+        try:
+            with self._session():
+                if include_archived:
+                    columns, rows = self._fetchall('get_student_by_id_with_archived',
+                                                   (student_id, student_id))
+                else:
+                    columns, rows = self._fetchall('get_student_by_id', (student_id,))
+            students = RowSet(columns, rows)
+
+            return students[0] if students else None
+        except Exception as e:
+            logger.error(f"Error retrieving student {student_id}: {e}")
+            raise
+
+    def _archived_id(self, email):
+        """ID of the archived student holding email, if any
+
+        Archiving frees the email in the hot table's UNIQUE index, so writes
+        check the archive to avoid re-creating an archived student under a
+        new ID. Call it inside the write's transaction: the lookup is a
+        locking read, so an archive batch cannot move the email between the
+        check and the write (one of them waits; if they deadlock, one fails
+        and nothing is duplicated).
+        """
+        _, rows = self._fetchall('archived_student_id_by_email', (email,))
+        return rows[0][0] if rows else None
+
+    def _upsert_unless_archived(self, values):
+        """_upsert(), skipping students whose email is archived"""
+        archived_id = self._archived_id(values[4])
+        if archived_id is not None:
+            return 'archived', archived_id
+        return self._upsert(values)
+
+    def add_student(self, name, address, city, state, email, phone):
+        """Add a new student to the database (StudentArchived if the email is archived)"""
+        try:
+            with self._session(), self.transaction():
+                archived_id = self._archived_id(email)
+                if archived_id is not None:
+                    raise StudentArchived(email, archived_id)
+                _, student_id = self._execute('add_student', (name, address, city, state, email, phone))
+
+            logger.info(f"Student added successfully with ID: {student_id}")
+            return student_id
+        except Exception as e:
+            logger.error(f"Error adding student: {e}")
+            raise
+
+    def upsert_student(self, name, address, city, state, email, phone):
+        """Insert or update a student by email, skipping unchanged records
+
+        Returns (result, student_id); result is 'archived' (nothing written)
+        when the email belongs to an archived student.
+        """
+        try:
+            with self._session(), self.transaction():
+                result, student_id = self._upsert_unless_archived((name, address, city, state, email, phone))
+
+            logger.info(f"Student {student_id} upserted by email: {result}")
+            return result, student_id
+        except Exception as e:
+            logger.error(f"Error upserting student {email}: {e}")
+            raise
+
+    def upsert_students(self, students):
+        """Upsert a batch of student dicts by email in one transaction
+
+        Returns counts of inserted, updated, unchanged and archived (skipped)
+        records.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+        try:
+            with self._session(), self.transaction():
+                for student in students:
+                    result, _ = self._upsert_unless_archived(tuple(student[field] for field in STUDENT_FIELDS))
+                    counts[result] += 1
+
+            logger.info(f"Upserted {len(students)} students by email: {counts}")
+            return counts
+        except Exception as e:
+            logger.error(f"Error upserting student batch: {e}")
+            raise
+
+    def update_student(self, student_id, name, address, city, state, email, phone):
+        """Update an existing student record (StudentArchived if the email is archived)"""
+        try:
+            with self._session(), self.transaction():
+                archived_id = self._archived_id(email)
+                if archived_id is not None:
+                    raise StudentArchived(email, archived_id)
+                values = (name, address, city, state, email, phone, student_id)
+                rows_affected, _ = self._execute('update_student', values)
+
+                # MySQL reports 0 affected rows when nothing changed, so tell
+                # "unchanged" apart from "not found" before reporting a miss
+                if rows_affected == 0:
+                    _, rows = self._fetchall('student_exists', (student_id,))
+                    rows_affected = len(rows)
+
+            if rows_affected > 0:
+                logger.info(f"Student {student_id} updated successfully")
+                return True
+            else:
+                logger.warning(f"Student {student_id} not found")
+                return False
+        except Exception as e:
+            logger.error(f"Error updating student {student_id}: {e}")
+            raise
+
+    def delete_student(self, student_id):
+        """Delete a student from the database"""
+        try:
+            with self._session():
+                rows_affected, _ = self._execute('delete_student', (student_id,))
+
+            if rows_affected > 0:
+                logger.info(f"Student {student_id} deleted successfully")
+                return True
+            else:
+                logger.warning(f"Student {student_id} not found")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting student {student_id}: {e}")
+            raise
+
+    def search_students(self, search_term):
+        """Search students by name, email, or city"""
+        try:
+            search_pattern = f"%{search_term}%"
+            with self._session():
+                columns, rows = self._fetchall('search_students',
+                                               (search_pattern, search_pattern, search_pattern))
+            students = RowSet(columns, rows)
+
+            logger.info(f"Search returned {len(students)} results")
+            return students
+        except Exception as e:
+            logger.error(f"Error searching students: {e}")
+            raise
+
+    def archive_cutoff(self, max_age_days):
+        """created_at cutoff for records older than max_age_days, computed by the database
+
+        Computing it in SQL keeps it in the same time zone the database uses
+        to compare created_at (the MySQL session time_zone, UTC in SQLite).
+        """
+        with self._session():
+            _, rows = self._fetchall('archive_cutoff', (max_age_days,))
+        return rows[0][0]
+
+    def archive_students(self, cutoff, batch_size):
+        """Move up to batch_size students created before cutoff into students_archive
+
+        The copy and delete run in one transaction, so an interrupted run
+        leaves every row in exactly one table. Returns the number moved.
+        """
+        try:
+            with self._session(), self.transaction():
+                copied, _ = self._execute('archive_students', (cutoff, batch_size))
+                deleted, _ = self._execute('purge_archived_students', (cutoff, batch_size))
+                if copied != deleted:
+                    raise RuntimeError(f"Archive batch mismatch: copied {copied}, deleted {deleted}")
+
+            logger.info(f"Archived {deleted} students created before {cutoff}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error archiving students: {e}")
+            raise
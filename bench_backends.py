@@ -0,0 +1,105 @@
+"""
+Per-query overhead micro-benchmark for the database backends
+Compares the backend against the previous per-call implementation
+(reproduced below from the code it replaced). SQLite always runs; MySQL
+runs when MYSQL_TEST_HOST is set.
+
+    python bench_backends.py [iterations]
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+import database_sqlite
+
+logging.disable(logging.INFO)
+
+# Query text exactly as the previous implementation sent it
+LEGACY_GET_STUDENT_BY_ID = """
+            SELECT id, name, address, city, state, email, phone,
+                   created_at, updated_at
+            FROM students
+            WHERE id = {placeholder}
+            """
+
+
+def bench(label, fn, iterations, repeat=5):
+    """Run fn iterations times (best of repeat) and print microseconds per call"""
+    fn()  # warm up (connect, prepare)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    per_call = best / iterations * 1e6
+    print(f"  {label:<44} {per_call:9.1f} us/query")
+    return per_call
+
+
+def bench_sqlite(iterations):
+    print("SQLite (get_student_by_id)")
+    db = database_sqlite.Database(database=':memory:')
+    db.init_database()
+
+    # Previous implementation: default connection settings (statement cache
+    # of 128), sqlite3.Row factory, new cursor per call, dict(row)
+    legacy_connection = sqlite3.connect(':memory:', check_same_thread=False)
+    db.connection.backup(legacy_connection)
+    legacy_connection.row_factory = sqlite3.Row
+    query = LEGACY_GET_STUDENT_BY_ID.format(placeholder='?')
+
+    def legacy_get():
+        cursor = legacy_connection.cursor()
+        cursor.execute(query, (3,))
+        row = cursor.fetchone()
+        student = dict(row) if row else None
+        cursor.close()
+        return student
+
+    before = bench('previous: cursor per call, dict(row)', legacy_get, iterations)
+    after = bench('backend: catalog query, Record row', lambda: db.get_student_by_id(3), iterations)
+    print(f"  ratio: {before / after:.2f}x")
+
+
+def bench_mysql(iterations):
+    if not os.environ.get('MYSQL_TEST_HOST'):
+        print("MySQL skipped (MYSQL_TEST_HOST not set)")
+        return
+
+    import database
+    print("MySQL (get_student_by_id)")
+    db = database.Database(
+        host=os.environ['MYSQL_TEST_HOST'],
+        user=os.environ.get('MYSQL_TEST_USER', 'ryde_user'),
+        password=os.environ.get('MYSQL_TEST_PASSWORD', 'ryde_password'),
+        database=os.environ.get('MYSQL_TEST_DATABASE', 'ryde_university_test')
+    )
+    db.init_database()
+    student_id = db.get_all_students()[0]['id']
+    query = LEGACY_GET_STUDENT_BY_ID.format(placeholder='%s')
+
+    # Previous implementation: get_connection() (is_connected() ping),
+    # text-protocol dictionary cursor per call
+    def legacy_get():
+        connection = db.get_connection()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, (student_id,))
+        student = cursor.fetchone()
+        cursor.close()
+        return student
+
+    before = bench('previous: ping + text-protocol cursor', legacy_get, iterations)
+    after = bench('backend: prepared statement', lambda: db.get_student_by_id(student_id), iterations)
+    print(f"  ratio: {before / after:.2f}x")
+    db.close_connection()
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    bench_sqlite(iterations)
+    bench_mysql(iterations)
@@ -0,0 +1,92 @@
+"""
+Memory and throughput benchmark for 100k-row reads
+Compares per-row dicts (previous behaviour) against a compact RowSet
+of tuples on an in-memory SQLite database.
+
+    python bench_rows.py [rows]
+"""
+
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import database_sqlite
+from rows import RowSetJSONEncoder, record_default
+
+logging.disable(logging.INFO)
+
+
+def load(db, count):
+    """Fill the students table with count rows"""
+    connection = db.get_connection()
+    connection.executemany("""
+        INSERT INTO students (name, address, city, state, email, phone)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, ((f'Student {i:06d}', f'{i} Long Street', 'Sydney', 'NSW',
+               f'student{i}@bench.test', '0400000000') for i in range(count)))
+    connection.commit()
+
+
+def encode_dicts(rows):
+    """Previous GET /api/students encoding (Flask sorts keys by default)"""
+    return json.dumps({'success': True, 'data': rows}, sort_keys=True)
+
+
+def encode_rowset(rows):
+    """Current GET /api/students encoding"""
+    return json.dumps({'success': True, 'data': rows}, cls=RowSetJSONEncoder,
+                      default=record_default, sort_keys=True)
+
+
+def measure(label, read, encode):
+    """Print read/encode time, GC pause, and memory retained and peak over read + encode"""
+    # Timing pass without tracemalloc overhead
+    gc.collect()
+    start = time.perf_counter()
+    rows = read()
+    read_time = time.perf_counter() - start
+
+    # Full collection with the result alive, as a worker would see it
+    start = time.perf_counter()
+    gc.collect()
+    gc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    body = encode(rows)
+    encode_time = time.perf_counter() - start
+    del rows, body
+
+    # Memory pass: what a request holds after the read, and its high-water mark
+    gc.collect()
+    tracemalloc.start()
+    rows = read()
+    retained, _ = tracemalloc.get_traced_memory()
+    body = encode(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows, body
+
+    print(f"  {label:<8} retained {retained / 2**20:6.1f} MiB  peak {peak / 2**20:6.1f} MiB  "
+          f"read {read_time * 1000:6.1f} ms  json {encode_time * 1000:6.1f} ms  "
+          f"total {(read_time + encode_time) * 1000:6.1f} ms  full gc {gc_time * 1000:5.1f} ms")
+
+
+def read_dicts(db):
+    """Previous behaviour: one dict per row"""
+    with db._session():
+        columns, rows = db._fetchall('get_all_students')
+    return [dict(zip(columns, row)) for row in rows]
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    db = database_sqlite.Database(database=':memory:')
+    db.init_database()
+    load(db, count)
+    print(f"get_all_students() over {len(db.get_all_students())} rows")
+
+    measure('dicts', lambda: read_dicts(db), encode_dicts)
+    measure('rowset', db.get_all_students, encode_rowset)
@@ -2,6 +2,7 @@
 Configuration file for Ryde University Student Records Application
 """
 
+import math
 import os
 from dotenv import load_dotenv
 
@@ -31,6 +32,34 @@ class Config:
     DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
     DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
     
+    # Prepared statements kept per connection (MySQL server-side, SQLite compiled);
+    # 0 disables the cache and prepares every query again
+    DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 128))
+    # Idle seconds after which the connection is pinged before the next query
+    DB_PING_INTERVAL = float(os.environ.get('DB_PING_INTERVAL', 30))
+
+    # Admission control (load shedding in front of the database)
+    # Writes get a reserved share of the pool so a read surge cannot starve them.
+    # The backend shares one connection per process, so database work itself is
+    # serialized; admitted requests wait for it only up to DB_QUEUE_TIMEOUT.
+    DB_WRITE_CONCURRENCY = int(os.environ.get('DB_WRITE_CONCURRENCY', max(1, DB_POOL_SIZE // 4)))
+    DB_READ_CONCURRENCY = int(os.environ.get('DB_READ_CONCURRENCY', max(1, DB_POOL_SIZE - DB_WRITE_CONCURRENCY)))
+    DB_READ_QUEUE_SIZE = int(os.environ.get('DB_READ_QUEUE_SIZE', DB_READ_CONCURRENCY * 2))
+    DB_WRITE_QUEUE_SIZE = int(os.environ.get('DB_WRITE_QUEUE_SIZE', DB_WRITE_CONCURRENCY * 2))
+    # Max seconds a request waits for a slot before failing fast with 503
+    DB_QUEUE_TIMEOUT = float(os.environ.get('DB_QUEUE_TIMEOUT', DB_POOL_TIMEOUT / 10))
+    # Retry-After seconds sent with 503 responses
+    DB_RETRY_AFTER = int(os.environ.get('DB_RETRY_AFTER', max(1, math.ceil(DB_QUEUE_TIMEOUT))))
+
+    # Max students per PUT /api/students/by-email/batch request
+    SYNC_BATCH_MAX_SIZE = int(os.environ.get('SYNC_BATCH_MAX_SIZE', 1000))
+    
+    # Archival of old student records into students_archive (flask archive-students)
+    ARCHIVE_MAX_AGE_DAYS = int(os.environ.get('ARCHIVE_MAX_AGE_DAYS', 730))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    # Seconds to sleep between batches (rate limit)
+    ARCHIVE_BATCH_PAUSE = float(os.environ.get('ARCHIVE_BATCH_PAUSE', 0.5))
+    
     # Application settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
 
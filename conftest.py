@@ -0,0 +1,31 @@
+"""
+Shared pytest fixtures
+The Flask app is tested against an in-memory SQLite database
+"""
+
+import importlib.util
+import sys
+
+import pytest
+
+import database_sqlite
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    pytest.importorskip('flask')
+    # Same swap as test_app.py when the MySQL driver is not installed
+    if importlib.util.find_spec('mysql') is None:
+        sys.modules.setdefault('database', database_sqlite)
+    import app as app_module
+
+    db = database_sqlite.Database(database=':memory:')
+    db.init_database()
+    monkeypatch.setattr(app_module, 'db', db)
+    yield app_module
+    db.close_connection()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
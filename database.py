@@ -4,28 +4,101 @@ Handles all database interactions for student records
 """
 
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, InterfaceError, errorcode
+from mysql.connector.cursor import MySQLCursorPrepared
 import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    from mysql.connector.connection_cext import CMySQLConnection
+    from mysql.connector.cursor_cext import CMySQLCursorPrepared
+except ImportError:
+    CMySQLConnection = CMySQLCursorPrepared = None
+
+from backend import DatabaseBackend
+from queries import render
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class Database:
+# Errors meaning the cached prepared statements are unusable: the connection
+# is gone, or the server session does not know the statement id
+STALE_SESSION_ERRORS = {
+    errorcode.CR_CONNECTION_ERROR,
+    errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+    errorcode.ER_UNKNOWN_STMT_HANDLER,
+}
+
+
+class PreparedCursor(MySQLCursorPrepared):
+    """Prepared cursor that re-executes its statement without COM_STMT_RESET
+
+    mysql-connector resets the statement before every execute, a round trip
+    that only discards COM_STMT_SEND_LONG_DATA parameters and server-side
+    cursors. The backend uses neither and always reads results in full, so
+    re-executing the same statement goes straight to COM_STMT_EXECUTE.
+    """
+
+    def execute(self, operation, params=None, multi=False):
+        if self._prepared is None or operation is not self._executed:
+            return super().execute(operation, params, multi)
+        result = self._connection.cmd_stmt_execute(
+            self._prepared['statement_id'], data=params or (), parameters=self._prepared['parameters'])
+        self._handle_result(result)
+
+
+if CMySQLCursorPrepared is not None:
+    class CPreparedCursor(CMySQLCursorPrepared):
+        """PreparedCursor for the C extension connection"""
+
+        def execute(self, operation, params=None, multi=False):
+            if self._stmt is None or operation is not self._executed:
+                return super().execute(operation, params, multi)
+            self._cnx.handle_unread_result(prepared=True)
+            result = self._cnx.cmd_stmt_execute(self._stmt, *(params or ()))
+            if result:
+                self._handle_result(result)
+
+
+class Database(DatabaseBackend):
     """Database handler for MySQL operations"""
     
-    def __init__(self, host, user, password, database):
+    queries = render('format')
+    
+    # ON DUPLICATE KEY UPDATE affected-row counts
+    UPSERT_RESULTS = {1: 'inserted', 2: 'updated', 0: 'unchanged'}
+    
+    def __init__(self, host, user, password, database, statement_cache_size=128, ping_interval=30):
         """Initialize database connection parameters"""
+        super().__init__()
         self.host = host
         self.user = user
         self.password = password
         self.database = database
         self.connection = None
+        
+        # Server-side prepared statements, one prepared cursor per catalog query
+        # (LRU); with a size of 0 every query is prepared and closed again
+        self.statement_cache_size = statement_cache_size
+        self._statements = OrderedDict()
+        self._cursor_class = PreparedCursor
+        
+        # The connection is pinged only after ping_interval idle seconds (or
+        # after a connection error), not before every operation
+        self.ping_interval = ping_interval
+        self._last_used = None
     
     def get_connection(self):
-        """Get database connection (create if doesn't exist)"""
+        """Get database connection (create if doesn't exist, check it after idling)"""
         try:
-            if self.connection is None or not self.connection.is_connected():
+            now = time.monotonic()
+            if self.connection is None:
                 self.connection = mysql.connector.connect(
                     host=self.host,
                     user=self.user,
@@ -33,17 +106,47 @@ class Database:
                     database=self.database,
                     autocommit=True
                 )
+                # Prepared statements belong to the old session
+                self._discard_statements()
+                if CMySQLConnection is not None and isinstance(self.connection, CMySQLConnection):
+                    self._cursor_class = CPreparedCursor
+                else:
+                    self._cursor_class = PreparedCursor
                 logger.info("Database connection established")
+            elif self._last_used is None or now - self._last_used > self.ping_interval:
+                self._check_connection()
+            self._last_used = now
             return self.connection
         except Error as e:
             logger.error(f"Error connecting to MySQL: {e}")
             raise
     
+    def _check_connection(self):
+        """Ping the server, reconnecting (and dropping stale statements) if the connection was lost"""
+        session_id = self.connection.connection_id
+        self.connection.ping(reconnect=True)
+        if self.connection.connection_id != session_id:
+            # reconnect() reuses the connection object, so the cached cursors
+            # would keep executing statement ids from the dead session
+            self._discard_statements()
+            logger.info("Database connection re-established")
+    
+    def ping(self):
+        """Check the connection for health checks, reconnecting if it was lost"""
+        with self._lock:
+            if self.connection is None:
+                self.get_connection()
+            else:
+                self._check_connection()
+                self._last_used = time.monotonic()
+    
     def close_connection(self):
         """Close database connection"""
         if self.connection and self.connection.is_connected():
+            self._close_statements()
             self.connection.close()
             logger.info("Database connection closed")
+        self.connection = None
     
     def init_database(self):
         """Initialize database schema"""
@@ -65,11 +168,42 @@ class Database:
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_name (name),
                 INDEX idx_email (email),
-                INDEX idx_city (city)
+                INDEX idx_city (city),
+                INDEX idx_created_at (created_at)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
             """
             
             cursor.execute(create_table_query)
+            
+            # Tables created before idx_created_at existed need it for archival
+            cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'students'
+              AND index_name = 'idx_created_at'
+            """)
+            if cursor.fetchone()[0] == 0:
+                cursor.execute("CREATE INDEX idx_created_at ON students (created_at)")
+            
+            # Cold table for archived students (keeps original ids and timestamps)
+            create_archive_query = """
+            CREATE TABLE IF NOT EXISTS students_archive (
+                id INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                address VARCHAR(255) NOT NULL,
+                city VARCHAR(100) NOT NULL,
+                state VARCHAR(100) NOT NULL,
+                email VARCHAR(255) NOT NULL,
+                phone VARCHAR(20) NOT NULL,
+                created_at TIMESTAMP NULL,
+                updated_at TIMESTAMP NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_archive_name (name),
+                INDEX idx_archive_email (email),
+                INDEX idx_archive_created_at (created_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+            """
+            
+            cursor.execute(create_archive_query)
             logger.info("Database schema initialized successfully")
             
             # Insert sample data if table is empty
@@ -94,146 +228,89 @@ class Database:
             logger.error(f"Error initializing database: {e}")
             raise
     
-    def get_all_students(self):
-        """Retrieve all students from database"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            ORDER BY name ASC
-            """
-            
-            cursor.execute(query)
-            students = cursor.fetchall()
+    def _close_statements(self):
+        """Deallocate all cached prepared statements"""
+        while self._statements:
+            _, cursor = self._statements.popitem()
             cursor.close()
-            
-            logger.info(f"Retrieved {len(students)} students")
-            return students
-        except Error as e:
-            logger.error(f"Error retrieving students: {e}")
-            raise
     
-    def get_student_by_id(self, student_id):
-        """Retrieve a specific student by ID"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            WHERE id = %s
-            """
-            
-            cursor.execute(query, (student_id,))
-            student = cursor.fetchone()
-            cursor.close()
-            
-            return student
-        except Error as e:
-            logger.error(f"Error retrieving student {student_id}: {e}")
-            raise
+    def _discard_statements(self):
+        """Forget cached statements whose session is gone (nothing to deallocate)"""
+        self._statements.clear()
     
-    def add_student(self, name, address, city, state, email, phone):
-        """Add a new student to the database"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            INSERT INTO students (name, address, city, state, email, phone)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            values = (name, address, city, state, email, phone)
-            cursor.execute(query, values)
-            
-            student_id = cursor.lastrowid
+    def _prepared_cursor(self, name):
+        """Get the prepared cursor for a catalog query (prepare on first use)"""
+        cursor = self._statements.get(name)
+        if cursor is not None:
+            self._statements.move_to_end(name)
+            return cursor
+        
+        # Built directly: connection.cursor() would ping the server first
+        cursor = self._cursor_class(self.connection)
+        if self.statement_cache_size > 0:
+            while len(self._statements) >= self.statement_cache_size:
+                _, evicted = self._statements.popitem(last=False)
+                evicted.close()
+            self._statements[name] = cursor
+        return cursor
+    
+    def _release_cursor(self, name, cursor):
+        """Close a cursor the statement cache does not keep"""
+        if self._statements.get(name) is not cursor:
             cursor.close()
-            
-            logger.info(f"Student added successfully with ID: {student_id}")
-            return student_id
-        except Error as e:
-            logger.error(f"Error adding student: {e}")
-            raise
     
-    def update_student(self, student_id, name, address, city, state, email, phone):
-        """Update an existing student record"""
+    def _run(self, name, params):
+        """Execute a catalog query on its prepared cursor and return the cursor"""
+        for attempt in range(2):
+            cursor = self._prepared_cursor(name)
+            try:
+                cursor.execute(self.queries[name], params)
+                return cursor
+            except Error as e:
+                if e.errno == errorcode.ER_UNKNOWN_STMT_HANDLER and not attempt:
+                    # The session no longer knows the statement, so it never
+                    # ran: drop the whole cache, prepare it again and retry
+                    logger.warning(f"Prepared statement {name} unknown to the server, preparing it again")
+                    self._discard_statements()
+                    continue
+                if e.errno in STALE_SESSION_ERRORS or isinstance(e, InterfaceError):
+                    # The statement may have run, so no retry; check the
+                    # connection before the next operation instead
+                    self._discard_statements()
+                    self._last_used = None
+                else:
+                    self._release_cursor(name, cursor)
+                raise
+    
+    def _fetchall(self, name, params=()):
+        """Run a prepared SELECT and return (column_names, row_tuples)"""
+        cursor = self._run(name, params)
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            UPDATE students 
-            SET name = %s, address = %s, city = %s, state = %s, 
-                email = %s, phone = %s
-            WHERE id = %s
-            """
-            
-            values = (name, address, city, state, email, phone, student_id)
-            cursor.execute(query, values)
-            
-            rows_affected = cursor.rowcount
-            cursor.close()
-            
-            if rows_affected > 0:
-                logger.info(f"Student {student_id} updated successfully")
-                return True
-            else:
-                logger.warning(f"Student {student_id} not found")
-                return False
-        except Error as e:
-            logger.error(f"Error updating student {student_id}: {e}")
-            raise
+            return cursor.column_names, cursor.fetchall()
+        finally:
+            self._release_cursor(name, cursor)
     
-    def delete_student(self, student_id):
-        """Delete a student from the database"""
+    def _execute(self, name, params=()):
+        """Run a prepared write statement and return (rowcount, lastrowid)"""
+        cursor = self._run(name, params)
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = "DELETE FROM students WHERE id = %s"
-            cursor.execute(query, (student_id,))
-            
-            rows_affected = cursor.rowcount
-            cursor.close()
-            
-            if rows_affected > 0:
-                logger.info(f"Student {student_id} deleted successfully")
-                return True
-            else:
-                logger.warning(f"Student {student_id} not found")
-                return False
-        except Error as e:
-            logger.error(f"Error deleting student {student_id}: {e}")
-            raise
+            return cursor.rowcount, cursor.lastrowid
+        finally:
+            self._release_cursor(name, cursor)
     
-    def search_students(self, search_term):
-        """Search students by name, email, or city"""
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed writes in one transaction (rolled back on error)"""
+        connection = self.connection
+        connection.start_transaction()
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            WHERE name LIKE %s OR email LIKE %s OR city LIKE %s
-            ORDER BY name ASC
-            """
-            
-            search_pattern = f"%{search_term}%"
-            cursor.execute(query, (search_pattern, search_pattern, search_pattern))
-            students = cursor.fetchall()
-            cursor.close()
-            
-            logger.info(f"Search returned {len(students)} results")
-            return students
-        except Error as e:
-            logger.error(f"Error searching students: {e}")
+            yield
+            connection.commit()
+        except Exception:
+            connection.rollback()
             raise
+    
+    def _upsert(self, values):
+        """Upsert one student by email and return (result, student_id)"""
+        rowcount, student_id = self._execute('upsert_student', values)
+        return self.UPSERT_RESULTS[rowcount], student_id
@@ -5,27 +5,65 @@ Handles all database interactions for student records
 
 import sqlite3
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 
+from backend import DatabaseBackend
+from queries import render
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class Database:
+class Database(DatabaseBackend):
     """Database handler for SQLite operations (local testing)"""
     
-    def __init__(self, host=None, user=None, password=None, database='ryde_university.db'):
+    queries = render('qmark', overrides={
+        # No ON UPDATE clause in SQLite, so bump updated_at explicitly
+        'update_student': """
+            UPDATE students
+            SET name = ?, address = ?, city = ?, state = ?,
+                email = ?, phone = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+        # No FOR SHARE in SQLite; transaction() takes the write lock up front instead
+        'archived_student_id_by_email': "SELECT id FROM students_archive WHERE email = ?",
+        # CURRENT_TIMESTAMP (and so created_at) is UTC in SQLite
+        'archive_cutoff': "SELECT datetime('now', '-' || ? || ' days')",
+        # Only rows whose values differ are touched, so updated_at stays put otherwise
+        'upsert_student': """
+            INSERT INTO students (name, address, city, state, email, phone)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(email) DO UPDATE SET
+                name = excluded.name, address = excluded.address, city = excluded.city,
+                state = excluded.state, phone = excluded.phone,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE students.name IS NOT excluded.name
+               OR students.address IS NOT excluded.address
+               OR students.city IS NOT excluded.city
+               OR students.state IS NOT excluded.state
+               OR students.phone IS NOT excluded.phone
+            """,
+    })
+    
+    def __init__(self, host=None, user=None, password=None, database='ryde_university.db',
+                 statement_cache_size=128, ping_interval=None):
         """Initialize database connection parameters"""
+        super().__init__()
         # For SQLite, we only need the database filename
         self.database = database
         self.connection = None
+        # Size of sqlite3's per-connection compiled statement cache
+        self.statement_cache_size = statement_cache_size
+        self._in_transaction = False
+        self._headers = {}
     
     def get_connection(self):
         """Get database connection (create if doesn't exist)"""
         try:
             if self.connection is None:
-                self.connection = sqlite3.connect(self.database, check_same_thread=False)
-                self.connection.row_factory = sqlite3.Row
+                self.connection = sqlite3.connect(self.database, check_same_thread=False,
+                                                  cached_statements=self.statement_cache_size)
                 logger.info("Database connection established")
             return self.connection
         except Exception as e:
@@ -36,8 +74,14 @@ class Database:
         """Close database connection"""
         if self.connection:
             self.connection.close()
+            self.connection = None
             logger.info("Database connection closed")
     
+    def ping(self):
+        """Check the connection for health checks"""
+        with self._lock:
+            self.get_connection().execute("SELECT 1").close()
+    
     def init_database(self):
         """Initialize database schema"""
         try:
@@ -45,6 +89,7 @@ class Database:
             cursor = connection.cursor()
             
             # Create students table
+            # email is case-insensitive, matching MySQL's utf8mb4_unicode_ci
             create_table_query = """
             CREATE TABLE IF NOT EXISTS students (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -52,7 +97,7 @@ class Database:
                 address TEXT NOT NULL,
                 city TEXT NOT NULL,
                 state TEXT NOT NULL,
-                email TEXT NOT NULL UNIQUE,
+                email TEXT NOT NULL UNIQUE COLLATE NOCASE,
                 phone TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -65,6 +110,26 @@ class Database:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_name ON students(name);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_email ON students(email);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_city ON students(city);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON students(created_at);")
+            
+            # Cold table for archived students (keeps original ids and timestamps)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS students_archive (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                address TEXT NOT NULL,
+                city TEXT NOT NULL,
+                state TEXT NOT NULL,
+                email TEXT NOT NULL COLLATE NOCASE,
+                phone TEXT NOT NULL,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_name ON students_archive(name);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_email ON students_archive(email);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_created_at ON students_archive(created_at);")
             
             connection.commit()
             logger.info("Database schema initialized successfully")
@@ -101,154 +166,51 @@ class Database:
             logger.error(f"Error initializing database: {e}")
             raise
     
-    def get_all_students(self):
-        """Retrieve all students from database"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            ORDER BY name ASC
-            """
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            # Convert Row objects to dictionaries
-            students = [dict(row) for row in rows]
-            cursor.close()
-            
-            logger.info(f"Retrieved {len(students)} students")
-            return students
-        except Exception as e:
-            logger.error(f"Error retrieving students: {e}")
-            raise
-    
-    def get_student_by_id(self, student_id):
-        """Retrieve a specific student by ID"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            WHERE id = ?
-            """
-            
-            cursor.execute(query, (student_id,))
-            row = cursor.fetchone()
-            
-            student = dict(row) if row else None
-            cursor.close()
-            
-            return student
-        except Exception as e:
-            logger.error(f"Error retrieving student {student_id}: {e}")
-            raise
-    
-    def add_student(self, name, address, city, state, email, phone):
-        """Add a new student to the database"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            INSERT INTO students (name, address, city, state, email, phone)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """
-            
-            cursor.execute(query, (name, address, city, state, email, phone))
-            connection.commit()
-            
-            student_id = cursor.lastrowid
-            cursor.close()
-            
-            logger.info(f"Student added successfully with ID: {student_id}")
-            return student_id
-        except Exception as e:
-            logger.error(f"Error adding student: {e}")
-            raise
+    def _fetchall(self, name, params=()):
+        """Run a cached SELECT and return (column_names, row_tuples)"""
+        # connection.execute reuses the compiled statement from the connection cache
+        cursor = self.connection.execute(self.queries[name], params)
+        rows = cursor.fetchall()
+        # Catalog queries name their columns, so the header is fixed per query
+        columns = self._headers.get(name)
+        if columns is None:
+            columns = self._headers[name] = tuple(column[0] for column in cursor.description)
+        cursor.close()
+        return columns, rows
     
-    def update_student(self, student_id, name, address, city, state, email, phone):
-        """Update an existing student record"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            UPDATE students 
-            SET name = ?, address = ?, city = ?, state = ?, 
-                email = ?, phone = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """
-            
-            cursor.execute(query, (name, address, city, state, email, phone, student_id))
+    def _execute(self, name, params=()):
+        """Run a cached write statement and return (rowcount, lastrowid)"""
+        connection = self.connection
+        cursor = connection.execute(self.queries[name], params)
+        if not self._in_transaction:
             connection.commit()
-            
-            rows_affected = cursor.rowcount
-            cursor.close()
-            
-            if rows_affected > 0:
-                logger.info(f"Student {student_id} updated successfully")
-                return True
-            else:
-                logger.warning(f"Student {student_id} not found")
-                return False
-        except Exception as e:
-            logger.error(f"Error updating student {student_id}: {e}")
-            raise
+        rowcount, lastrowid = cursor.rowcount, cursor.lastrowid
+        cursor.close()
+        return rowcount, lastrowid
     
-    def delete_student(self, student_id):
-        """Delete a student from the database"""
+    @contextmanager
+    def transaction(self):
+        """Commit the enclosed writes together (rolled back on error)"""
+        connection = self.connection
+        # IMMEDIATE takes the write lock before the first read, so checks made
+        # in the transaction still hold when its writes run
+        connection.execute("BEGIN IMMEDIATE")
+        self._in_transaction = True
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = "DELETE FROM students WHERE id = ?"
-            cursor.execute(query, (student_id,))
+            yield
             connection.commit()
-            
-            rows_affected = cursor.rowcount
-            cursor.close()
-            
-            if rows_affected > 0:
-                logger.info(f"Student {student_id} deleted successfully")
-                return True
-            else:
-                logger.warning(f"Student {student_id} not found")
-                return False
-        except Exception as e:
-            logger.error(f"Error deleting student {student_id}: {e}")
+        except Exception:
+            connection.rollback()
             raise
+        finally:
+            self._in_transaction = False
     
-    def search_students(self, search_term):
-        """Search students by name, email, or city"""
-        try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            query = """
-            SELECT id, name, address, city, state, email, phone, 
-                   created_at, updated_at 
-            FROM students 
-            WHERE name LIKE ? OR email LIKE ? OR city LIKE ?
-            ORDER BY name ASC
-            """
-            
-            search_pattern = f"%{search_term}%"
-            cursor.execute(query, (search_pattern, search_pattern, search_pattern))
-            rows = cursor.fetchall()
-            
-            students = [dict(row) for row in rows]
-            cursor.close()
-            
-            logger.info(f"Search returned {len(students)} results")
-            return students
-        except Exception as e:
-            logger.error(f"Error searching students: {e}")
-            raise
+    def _upsert(self, values):
+        """Upsert one student by email and return (result, student_id)"""
+        # SQLite reports one changed row for both insert and update, so look
+        # up the existing id first (same connection and transaction)
+        _, rows = self._fetchall('student_id_by_email', (values[4],))
+        rowcount, lastrowid = self._execute('upsert_student', values)
+        if not rows:
+            return 'inserted', lastrowid
+        return ('updated' if rowcount > 0 else 'unchanged'), rows[0][0]
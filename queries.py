@@ -0,0 +1,127 @@
+"""
+Query catalog shared by the MySQL and SQLite backends
+SQL is written once with %s placeholders and rendered per backend paramstyle
+"""
+
+# Writable student fields, in the order every write statement binds them
+STUDENT_FIELDS = ('name', 'address', 'city', 'state', 'email', 'phone')
+
+STUDENT_COLUMNS = """id, name, address, city, state, email, phone,
+                   created_at, updated_at"""
+
+QUERIES = {
+    'get_all_students': f"""
+            SELECT {STUDENT_COLUMNS}
+            FROM students
+            ORDER BY name ASC
+            """,
+
+    # include_archived reads: hot and cold tables, flagged by an archived column
+    'get_all_students_with_archived': f"""
+            SELECT {STUDENT_COLUMNS}, 0 AS archived
+            FROM students
+            UNION ALL
+            SELECT {STUDENT_COLUMNS}, 1 AS archived
+            FROM students_archive
+            ORDER BY name ASC
+            """,
+
+    'get_student_by_id_with_archived': f"""
+            SELECT {STUDENT_COLUMNS}, 0 AS archived
+            FROM students
+            WHERE id = %s
+            UNION ALL
+            SELECT {STUDENT_COLUMNS}, 1 AS archived
+            FROM students_archive
+            WHERE id = %s
+            """,
+
+    'get_student_by_id': f"""
+            SELECT {STUDENT_COLUMNS}
+            FROM students
+            WHERE id = %s
+            """,
+
+    'add_student': """
+            INSERT INTO students (name, address, city, state, email, phone)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+
+    'update_student': """
+            UPDATE students
+            SET name = %s, address = %s, city = %s, state = %s,
+                email = %s, phone = %s
+            WHERE id = %s
+            """,
+
+    'student_exists': "SELECT 1 FROM students WHERE id = %s",
+
+    'student_id_by_email': "SELECT id FROM students WHERE email = %s",
+
+    # Upsert by the UNIQUE email key. Affected rows: 1 inserted, 2 updated,
+    # 0 unchanged (so ON UPDATE CURRENT_TIMESTAMP only fires on real changes).
+    # LAST_INSERT_ID(id) makes lastrowid the existing id on the update path.
+    'upsert_student': """
+            INSERT INTO students (name, address, city, state, email, phone)
+            VALUES (%s, %s, %s, %s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE
+                id = LAST_INSERT_ID(students.id),
+                name = new.name, address = new.address, city = new.city,
+                state = new.state, phone = new.phone
+            """,
+
+    # Locking read, run inside the write's transaction: an archive batch
+    # moving this email waits for the write (or the write waits for it)
+    'archived_student_id_by_email': "SELECT id FROM students_archive WHERE email = %s FOR SHARE",
+
+    'archive_cutoff': "SELECT NOW() - INTERVAL %s DAY",
+
+    # Archival: move the oldest batch created before a cutoff into the cold
+    # table. Both statements select the same batch via idx_created_at; the
+    # derived table lets MySQL use LIMIT and delete from the table it reads.
+    'archive_students': f"""
+            INSERT INTO students_archive ({STUDENT_COLUMNS})
+            SELECT {STUDENT_COLUMNS}
+            FROM students
+            WHERE id IN (SELECT id FROM (
+                SELECT id FROM students
+                WHERE created_at < %s
+                ORDER BY created_at, id
+                LIMIT %s) AS batch)
+            """,
+
+    'purge_archived_students': """
+            DELETE FROM students
+            WHERE id IN (SELECT id FROM (
+                SELECT id FROM students
+                WHERE created_at < %s
+                ORDER BY created_at, id
+                LIMIT %s) AS batch)
+            """,
+
+    'delete_student': "DELETE FROM students WHERE id = %s",
+
+    'search_students': f"""
+            SELECT {STUDENT_COLUMNS}
+            FROM students
+            WHERE name LIKE %s OR email LIKE %s OR city LIKE %s
+            ORDER BY name ASC
+            """,
+}
+
+
+def render(paramstyle, overrides=None):
+    """Return the catalog with placeholders for the given DB-API paramstyle
+
+    paramstyle is 'format' (MySQL, %s) or 'qmark' (SQLite, ?). overrides maps
+    query names to backend-specific SQL that replaces the shared text.
+    """
+    if paramstyle == 'format':
+        rendered = dict(QUERIES)
+    elif paramstyle == 'qmark':
+        rendered = {name: sql.replace('%s', '?') for name, sql in QUERIES.items()}
+    else:
+        raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+
+    rendered.update(overrides or {})
+    return rendered
@@ -0,0 +1,229 @@
+"""
+Compact row representation for query results
+Rows stay as the driver's value tuples and share one column header,
+instead of a dict (with its own key table) per row
+"""
+
+import json
+from collections.abc import Mapping
+
+
+class Record:
+    """Read-only row with attribute and mapping access over a value tuple
+
+    Supports student.name (Jinja templates), student['name'], keys(),
+    items(), get() and dict(student). Use record_type() to get the
+    subclass for a column header.
+    """
+
+    __slots__ = ('_values',)
+
+    _fields = ()
+    _index = {}
+
+    def __init__(self, values):
+        """Wrap a row tuple whose order matches _fields"""
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._fields == other._fields and self._values == other._values
+        if isinstance(other, Mapping):
+            return self._asdict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.items())
+        return f"Record({fields})"
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._fields, self._values)
+
+    def _asdict(self):
+        """Plain dict copy of the row (used for JSON encoding)"""
+        return dict(zip(self._fields, self._values))
+
+
+Mapping.register(Record)
+
+_record_types = {}
+
+
+def _column_property(index):
+    return property(lambda self: self._values[index])
+
+
+def record_type(columns):
+    """Return the Record subclass for a column header (cached per header)"""
+    columns = tuple(columns)
+    cls = _record_types.get(columns)
+    if cls is None:
+        namespace = {
+            '__slots__': (),
+            '_fields': columns,
+            '_index': {name: index for index, name in enumerate(columns)}
+        }
+        for index, name in enumerate(columns):
+            # Columns that clash with Record methods stay reachable via record[name]
+            if not hasattr(Record, name):
+                namespace[name] = _column_property(index)
+        cls = type('Record', (Record,), namespace)
+        _record_types[columns] = cls
+    return cls
+
+
+class RowSet:
+    """Query result: a list of row tuples sharing one column header
+
+    Iterating or indexing yields Record views, created on demand, so a
+    large result holds only plain tuples (which the garbage collector
+    stops tracking) rather than one container object per row.
+    """
+
+    __slots__ = ('columns', 'rows', '_record')
+
+    def __init__(self, columns, rows):
+        """Wrap driver row tuples whose order matches columns"""
+        self.columns = tuple(columns)
+        self.rows = rows
+        self._record = record_type(self.columns)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return map(self._record, self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RowSet(self.columns, self.rows[index])
+        return self._record(self.rows[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (RowSet, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RowSet(columns={self.columns!r}, rows={len(self.rows)})"
+
+
+def record_default(obj):
+    """JSON default hook - encode a Record as an object"""
+    if isinstance(obj, Record):
+        return obj._asdict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _contains_rowset(obj):
+    if isinstance(obj, RowSet):
+        return True
+    if isinstance(obj, dict):
+        return any(_contains_rowset(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_rowset(value) for value in obj)
+    return False
+
+
+def _expand_rowsets(obj):
+    """Copy of obj with every RowSet replaced by a list of dicts"""
+    if isinstance(obj, RowSet):
+        return [dict(zip(obj.columns, row)) for row in obj.rows]
+    if isinstance(obj, dict):
+        return {key: _expand_rowsets(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_expand_rowsets(value) for value in obj]
+    return obj
+
+
+class RowSetJSONEncoder(json.JSONEncoder):
+    """JSONEncoder that writes RowSet results chunk_size rows at a time
+
+    Only one chunk of per-row dicts exists at any moment, instead of a
+    dict for every row of the result. Everything else is encoded by the
+    standard (C accelerated) encoder. Indented output (e.g. Flask debug
+    mode) is left to the standard encoder after expanding the RowSets.
+    """
+
+    chunk_size = 1000
+
+    def iterencode(self, o, _one_shot=False):
+        if not _contains_rowset(o):
+            return super().iterencode(o, _one_shot)
+        if self.indent is not None:
+            return super().iterencode(_expand_rowsets(o), _one_shot)
+        return self._iterencode(o)
+
+    def _encode_key(self, key):
+        """JSON text for a dict key, coerced like json.JSONEncoder (None if skipped)"""
+        if isinstance(key, str):
+            return self.encode(key)
+        if key is None or isinstance(key, (bool, int, float)):
+            # Same text as the value would get: true, null, 1, 1.5, NaN
+            return self.encode(self.encode(key))
+        if self.skipkeys:
+            return None
+        raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+    def _iterencode(self, o):
+        if isinstance(o, RowSet):
+            yield from self._iterencode_rowset(o)
+        elif isinstance(o, dict):
+            items = sorted(o.items()) if self.sort_keys else o.items()
+            first = True
+            yield '{'
+            for key, value in items:
+                key = self._encode_key(key)
+                if key is None:
+                    continue
+                if not first:
+                    yield self.item_separator
+                first = False
+                yield key
+                yield self.key_separator
+                yield from self.iterencode(value, _one_shot=True)
+            yield '}'
+        else:
+            yield '['
+            for index, value in enumerate(o):
+                if index:
+                    yield self.item_separator
+                yield from self.iterencode(value, _one_shot=True)
+            yield ']'
+
+    def _iterencode_rowset(self, rowset):
+        columns, rows = rowset.columns, rowset.rows
+        yield '['
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = [dict(zip(columns, row)) for row in rows[start:start + self.chunk_size]]
+            if start:
+                yield self.item_separator
+            # Encode the chunk as one array and strip its brackets
+            yield ''.join(super().iterencode(chunk, _one_shot=True))[1:-1]
+        yield ']'
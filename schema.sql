@@ -26,6 +26,25 @@ CREATE TABLE IF NOT EXISTS students (
     INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Cold table for archived students (see archive.py)
+-- Rows keep their original id and timestamps; reads only include it with ?include_archived=1
+CREATE TABLE IF NOT EXISTS students_archive (
+    id INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    address VARCHAR(255) NOT NULL,
+    city VARCHAR(100) NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    phone VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    INDEX idx_archive_name (name),
+    INDEX idx_archive_email (email),
+    INDEX idx_archive_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Insert sample data
 INSERT INTO students (name, address, city, state, email, phone) VALUES
 ('John Doe', 'Example Address', 'Example City', 'example State', 'example@example.com', '9009009009'),
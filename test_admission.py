@@ -0,0 +1,177 @@
+"""
+Admission control tests
+"""
+
+import threading
+import time
+
+import pytest
+
+import database_sqlite
+from admission import AdmissionController, AdmissionRejected, Budget
+
+
+def test_fast_path_admits_without_queueing():
+    budget = Budget('read', limit=2, queue_size=2, queue_timeout=1, retry_after=5)
+    budget.acquire()
+    budget.acquire()
+
+    metrics = budget.metrics()
+    assert metrics['active'] == 2
+    assert metrics['admitted'] == 2
+    assert metrics['queued'] == 0
+
+    budget.release()
+    budget.release()
+    assert budget.metrics()['active'] == 0
+
+
+def test_rejects_when_queue_full():
+    budget = Budget('write', limit=1, queue_size=0, queue_timeout=1, retry_after=7)
+    budget.acquire()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        budget.acquire()
+    assert excinfo.value.reason == 'queue full'
+    assert excinfo.value.retry_after == 7
+
+    metrics = budget.metrics()
+    assert metrics['rejected_queue_full'] == 1
+    assert metrics['active'] == 1
+    budget.release()
+
+
+def test_rejects_on_queue_timeout_and_records_wait():
+    budget = Budget('read', limit=1, queue_size=1, queue_timeout=0.05, retry_after=1)
+    budget.acquire()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        budget.acquire()
+    assert excinfo.value.reason == 'queue timeout'
+
+    metrics = budget.metrics()
+    assert metrics['rejected_timeout'] == 1
+    assert metrics['waiting'] == 0
+    assert metrics['queued'] == 1
+    assert metrics['queue_time_max'] >= 0.05
+    assert metrics['queue_time_total'] >= 0.05
+    budget.release()
+
+
+def test_release_hands_slot_to_queued_request():
+    budget = Budget('read', limit=1, queue_size=1, queue_timeout=5, retry_after=1)
+    budget.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        budget.acquire()
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    while budget.metrics()['waiting'] == 0:
+        time.sleep(0.001)
+    assert not admitted.is_set()
+
+    budget.release()
+    thread.join(timeout=5)
+    assert admitted.is_set()
+
+    metrics = budget.metrics()
+    assert metrics['active'] == 1
+    assert metrics['admitted'] == 2
+    assert metrics['queued'] == 1
+    budget.release()
+
+
+def test_over_budget_request_gets_503_with_retry_after(app_module, client, monkeypatch):
+    budget = app_module.admission.budgets['read']
+    monkeypatch.setattr(budget, 'limit', 0)
+    monkeypatch.setattr(budget, 'queue_size', 0)
+
+    response = client.get('/api/students')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(budget.retry_after)
+    assert response.get_json()['success'] is False
+
+    response = client.get('/students')
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+    # Writes have their own budget and are not shed with reads
+    response = client.delete('/api/students/987654321')
+    assert response.status_code == 404
+
+    metrics = client.get('/metrics/admission').get_json()
+    assert metrics['read']['rejected_queue_full'] >= 2
+
+
+def test_database_lock_wait_is_bounded_by_queue_deadline():
+    db = database_sqlite.Database(database=':memory:')
+    db.init_database()
+    controller = AdmissionController({
+        'read': Budget('read', limit=2, queue_size=0, queue_timeout=0.05, retry_after=3)
+    })
+
+    @controller.limit('read')
+    def view():
+        # Like the app's views: any exception becomes a 500 response
+        try:
+            return db.get_all_students()
+        except Exception:
+            return 'error', 500
+
+    # Another operation (e.g. a long sync batch) holds the shared connection
+    held, done = threading.Event(), threading.Event()
+
+    def holder():
+        with db._session():
+            held.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            view()
+        assert time.monotonic() - start < 1
+        assert excinfo.value.reason == 'database busy'
+        assert excinfo.value.retry_after == 3
+    finally:
+        done.set()
+        thread.join(5)
+
+    metrics = controller.metrics()['read']
+    assert metrics['rejected_database_busy'] == 1
+    assert metrics['rejected_total'] == 1
+    assert metrics['active'] == 0
+
+    # Free connection: admitted normally; outside admission control no deadline applies
+    assert len(view()) > 0
+    assert len(db.get_all_students()) > 0
+    db.close_connection()
+
+
+def test_database_busy_gets_503(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.admission.budgets['read'], 'queue_timeout', 0.05)
+    held, done = threading.Event(), threading.Event()
+
+    def holder():
+        with app_module.db._session():
+            held.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        response = client.get('/api/students')
+    finally:
+        done.set()
+        thread.join(5)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app_module.admission.budgets['read'].retry_after)
+    assert 'database busy' in response.get_json()['error']
@@ -0,0 +1,116 @@
+"""
+HTTP tests for the student sync (upsert by email) endpoints
+"""
+
+import pytest
+
+
+def student(**overrides):
+    fields = {
+        'name': 'Sync Student',
+        'address': '1 Sync Street',
+        'city': 'Ryde',
+        'state': 'NSW',
+        'email': 'sync.student@example.com',
+        'phone': '0400000000'
+    }
+    fields.update(overrides)
+    return fields
+
+
+def test_upsert_inserts_then_reports_unchanged_and_updated(client):
+    response = client.put('/api/students/by-email', json=student())
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['result'] == 'inserted'
+    assert (body['inserted'], body['updated'], body['unchanged']) == (1, 0, 0)
+    student_id = body['id']
+
+    response = client.put('/api/students/by-email', json=student())
+    assert response.status_code == 200
+    assert response.get_json()['result'] == 'unchanged'
+
+    response = client.put('/api/students/by-email', json=student(city='Parramatta'))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['result'] == 'updated' and body['id'] == student_id
+
+
+def test_upsert_missing_field(client):
+    response = client.put('/api/students/by-email', json=student(phone=''))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Missing required field: phone'
+
+
+@pytest.mark.parametrize('wrap', [lambda students: {'students': students}, lambda students: students],
+                         ids=['object', 'bare-list'])
+def test_batch_upsert_counts(client, wrap):
+    students = [
+        student(email='jane.smith@example.com', name='Jane Smith', address='123 Main Street',
+                city='Sydney', state='NSW', phone='0412345678'),
+        student(email='mike.johnson@example.com', name='Mike Johnson', city='Changed'),
+        student()
+    ]
+    response = client.put('/api/students/by-email/batch', json=wrap(students))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['total'] == 3
+    assert (body['inserted'], body['updated'], body['unchanged']) == (1, 1, 1)
+
+
+def test_batch_reports_invalid_student_index(client):
+    response = client.put('/api/students/by-email/batch',
+                          json={'students': [student(), student(email='other@example.com', city='')]})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Student 1: missing required field: city'
+    # Validation happens before any write, so the valid record was not stored
+    emails = [s['email'] for s in client.get('/api/students').get_json()['data']]
+    assert 'sync.student@example.com' not in emails
+
+
+def test_batch_rejects_non_list(client):
+    response = client.put('/api/students/by-email/batch', json={'students': 'nope'})
+    assert response.status_code == 400
+
+
+def test_batch_too_large(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'SYNC_BATCH_MAX_SIZE', 2)
+    students = [student(email=f's{i}@example.com') for i in range(3)]
+    response = client.put('/api/students/by-email/batch', json=students)
+    assert response.status_code == 413
+    assert 'max 2' in response.get_json()['error']
+
+
+def test_post_and_put_share_validation(client):
+    response = client.post('/api/students', json=student(name=''))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Missing required field: name'
+
+    response = client.put('/api/students/1', json=student(email=''))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Missing required field: email'
+
+
+def test_archived_email_returns_conflict(app_module, client):
+    db = app_module.db
+    db.get_connection().execute("UPDATE students SET created_at = '2000-01-01 00:00:00' WHERE id = 2")
+    db.connection.commit()
+    assert db.archive_students('2000-06-01 00:00:00', 100) == 1
+
+    jane = student(email='jane.smith@example.com')
+    response = client.put('/api/students/by-email', json=jane)
+    assert response.status_code == 409
+    assert response.get_json()['id'] == 2
+
+    response = client.post('/api/students', json=jane)
+    assert response.status_code == 409
+    assert response.get_json()['archived_id'] == 2
+
+    body = client.put('/api/students/by-email/batch', json=[jane]).get_json()
+    assert body['archived'] == 1 and body['inserted'] == 0
+
+    # Moving a hot student onto the archived email is refused too
+    response = client.put('/api/students/3', json=jane)
+    assert response.status_code == 409
+    assert response.get_json()['archived_id'] == 2
+    assert db.get_student_by_id(3)['email'] == 'mike.johnson@example.com'
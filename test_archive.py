@@ -0,0 +1,69 @@
+"""
+Archiver batching tests
+"""
+
+import archive
+from archive import Archiver
+
+
+class FakeDatabase:
+    """Hot table of `remaining` old rows, recording archive calls"""
+
+    def __init__(self, remaining):
+        self.remaining = remaining
+        self.calls = []
+
+    def archive_cutoff(self, max_age_days):
+        return f'cutoff-{max_age_days}'
+
+    def archive_students(self, cutoff, batch_size):
+        self.calls.append((cutoff, batch_size))
+        moved = min(self.remaining, batch_size)
+        self.remaining -= moved
+        return moved
+
+
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(archive.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_run_moves_everything_in_batches(monkeypatch):
+    sleeps = no_sleep(monkeypatch)
+    db = FakeDatabase(remaining=7)
+
+    assert Archiver(db, max_age_days=30, batch_size=3, pause=0.25).run() == 7
+    assert db.calls == [('cutoff-30', 3)] * 3
+    assert db.remaining == 0
+    # Pause between full batches only; the short last batch ends the run
+    assert sleeps == [0.25, 0.25]
+
+
+def test_run_stops_on_empty_batch(monkeypatch):
+    sleeps = no_sleep(monkeypatch)
+    db = FakeDatabase(remaining=6)
+
+    assert Archiver(db, max_age_days=30, batch_size=3, pause=1).run() == 6
+    assert len(db.calls) == 3
+    assert sleeps == [1, 1]
+
+
+def test_run_resumes_after_max_batches(monkeypatch):
+    no_sleep(monkeypatch)
+    db = FakeDatabase(remaining=10)
+    archiver = Archiver(db, max_age_days=30, batch_size=3, pause=0, max_batches=2)
+
+    assert archiver.run() == 6
+    assert db.remaining == 4
+    assert archiver.run() == 4
+    assert db.remaining == 0
+
+
+def test_run_with_nothing_to_archive(monkeypatch):
+    sleeps = no_sleep(monkeypatch)
+    db = FakeDatabase(remaining=0)
+
+    assert Archiver(db, max_age_days=30, batch_size=3, pause=1).run() == 0
+    assert len(db.calls) == 1
+    assert sleeps == []
@@ -0,0 +1,285 @@
+"""
+Backend conformance tests
+Runs the same checks against every Database backend so MySQL and SQLite
+behave the same. SQLite always runs; MySQL runs when MYSQL_TEST_HOST is set.
+
+    python -m pytest -q test_backends.py
+"""
+
+import importlib.util
+import os
+import uuid
+
+import pytest
+
+import database_sqlite
+from backend import StudentArchived
+
+
+def make_sqlite():
+    return database_sqlite.Database(database=':memory:')
+
+
+def make_mysql():
+    if not os.environ.get('MYSQL_TEST_HOST'):
+        pytest.skip('MYSQL_TEST_HOST not set')
+    pytest.importorskip('mysql.connector')
+    # Loaded from its file: test_app.py swaps the 'database' module for SQLite
+    spec = importlib.util.spec_from_file_location(
+        'database_mysql', os.path.join(os.path.dirname(__file__), 'database.py'))
+    database_mysql = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(database_mysql)
+    return database_mysql.Database(
+        host=os.environ['MYSQL_TEST_HOST'],
+        user=os.environ.get('MYSQL_TEST_USER', 'ryde_user'),
+        password=os.environ.get('MYSQL_TEST_PASSWORD', 'ryde_password'),
+        database=os.environ.get('MYSQL_TEST_DATABASE', 'ryde_university_test')
+    )
+
+
+@pytest.fixture(params=['sqlite', 'mysql'])
+def db(request):
+    backend = make_sqlite() if request.param == 'sqlite' else make_mysql()
+    backend.init_database()
+    created = []
+    backend.created = created
+    yield backend
+    for student_id in created:
+        backend.delete_student(student_id)
+    backend.close_connection()
+
+
+def new_student(db, **overrides):
+    """Insert a student with a unique email and remember it for cleanup"""
+    fields = {
+        'name': 'Conformance Student',
+        'address': '1 Test Street',
+        'city': 'Ryde',
+        'state': 'NSW',
+        'email': f'{uuid.uuid4().hex}@conformance.test',
+        'phone': '0400000000'
+    }
+    fields.update(overrides)
+    student_id = db.add_student(**fields)
+    db.created.append(student_id)
+    return student_id, fields
+
+
+STUDENT_KEYS = {'id', 'name', 'address', 'city', 'state', 'email', 'phone', 'created_at', 'updated_at'}
+
+
+def test_get_all_students_sorted_by_name(db):
+    students = db.get_all_students()
+    assert students
+    names = [s['name'] for s in students]
+    assert names == sorted(names)
+    assert set(students[0].keys()) == STUDENT_KEYS
+
+
+def test_add_and_get_student(db):
+    student_id, fields = new_student(db)
+    assert isinstance(student_id, int) and student_id > 0
+
+    student = db.get_student_by_id(student_id)
+    assert set(student.keys()) == STUDENT_KEYS
+    assert student['id'] == student_id
+    for key, value in fields.items():
+        assert student[key] == value
+
+
+def test_get_missing_student_returns_none(db):
+    assert db.get_student_by_id(987654321) is None
+
+
+def test_duplicate_email_raises(db):
+    _, fields = new_student(db)
+    with pytest.raises(Exception):
+        db.add_student(**fields)
+
+
+def test_update_student(db):
+    student_id, fields = new_student(db)
+    fields['city'] = 'Parramatta'
+    assert db.update_student(student_id, **fields) is True
+    assert db.get_student_by_id(student_id)['city'] == 'Parramatta'
+
+
+def test_update_unchanged_student_is_found(db):
+    student_id, fields = new_student(db)
+    assert db.update_student(student_id, **fields) is True
+
+
+def test_update_missing_student(db):
+    _, fields = new_student(db)
+    fields['email'] = f'{uuid.uuid4().hex}@conformance.test'
+    assert db.update_student(987654321, **fields) is False
+
+
+def test_delete_student(db):
+    student_id, _ = new_student(db)
+    assert db.delete_student(student_id) is True
+    assert db.delete_student(student_id) is False
+    assert db.get_student_by_id(student_id) is None
+
+
+def test_search_students(db):
+    marker = uuid.uuid4().hex[:12]
+    student_id, _ = new_student(db, city=f'Search{marker}')
+    results = db.search_students(marker)
+    assert [s['id'] for s in results] == [student_id]
+    assert db.search_students(f'nomatch{uuid.uuid4().hex}') == []
+
+
+def test_repeated_queries_reuse_statements(db):
+    # Same catalog query many times must keep returning correct results
+    student_id, _ = new_student(db)
+    for _ in range(50):
+        assert db.get_student_by_id(student_id)['id'] == student_id
+
+
+def test_rows_are_compact_records(db):
+    student_id, fields = new_student(db)
+    student = db.get_student_by_id(student_id)
+    assert not hasattr(student, '__dict__')
+    assert student.email == fields['email']
+    assert dict(student)['email'] == fields['email']
+    assert student.get('missing', 'default') == 'default'
+
+    students = db.get_all_students()
+    assert type(students[0]) is type(student)
+
+
+def test_upsert_student_by_email(db):
+    _, fields = new_student(db)
+    assert db.upsert_student(**fields)[0] == 'unchanged'
+
+    fields['phone'] = '0411111111'
+    result, student_id = db.upsert_student(**fields)
+    assert result == 'updated'
+    assert db.get_student_by_id(student_id)['phone'] == '0411111111'
+
+    fields['email'] = f'{uuid.uuid4().hex}@conformance.test'
+    result, student_id = db.upsert_student(**fields)
+    db.created.append(student_id)
+    assert result == 'inserted'
+    assert db.get_student_by_id(student_id)['email'] == fields['email']
+
+
+def test_email_is_case_insensitive(db):
+    student_id, fields = new_student(db)
+    upper = dict(fields, email=fields['email'].upper())
+
+    assert db.upsert_student(**upper) == ('unchanged', student_id)
+    assert db.get_student_by_id(student_id)['email'] == fields['email']
+    with pytest.raises(Exception):
+        db.add_student(**upper)
+
+
+def test_upsert_students_batch_counts(db):
+    _, existing = new_student(db)
+    changed = dict(existing, email=new_student(db)[1]['email'], city='Changed')
+    fresh = dict(existing, email=f'{uuid.uuid4().hex}@conformance.test')
+
+    counts = db.upsert_students([existing, changed, fresh])
+    db.created.append(db.upsert_student(**fresh)[1])
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1, 'archived': 0}
+
+
+def test_upsert_students_batch_is_atomic(db):
+    fresh = {
+        'name': 'Atomic', 'address': '1 Test Street', 'city': 'Ryde', 'state': 'NSW',
+        'email': f'{uuid.uuid4().hex}@conformance.test', 'phone': '0400000000'
+    }
+    with pytest.raises(Exception):
+        db.upsert_students([fresh, dict(fresh, email=None)])
+    assert db.search_students(fresh['email']) == []
+
+
+def run_sql(db, sql, params):
+    """Run ad-hoc SQL written with %s placeholders on either backend"""
+    connection = db.get_connection()
+    if isinstance(db, database_sqlite.Database):
+        sql = sql.replace('%s', '?')
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+    cursor.close()
+    connection.commit()
+
+
+def test_archive_moves_old_students(db):
+    old_id, _ = new_student(db)
+    recent_id, _ = new_student(db)
+    run_sql(db, "UPDATE students SET created_at = %s WHERE id = %s", ('2000-01-01 00:00:00', old_id))
+
+    assert db.archive_students('2000-06-01 00:00:00', 100) == 1
+    assert db.archive_students('2000-06-01 00:00:00', 100) == 0
+
+    assert db.get_student_by_id(old_id) is None
+    assert db.get_student_by_id(recent_id) is not None
+    archived = db.get_student_by_id(old_id, include_archived=True)
+    assert archived['id'] == old_id and archived['archived'] == 1
+    assert db.get_student_by_id(recent_id, include_archived=True)['archived'] == 0
+
+    assert old_id not in [s['id'] for s in db.get_all_students()]
+    assert old_id in [s['id'] for s in db.get_all_students(include_archived=True)]
+
+    run_sql(db, "DELETE FROM students_archive WHERE id = %s", (old_id,))
+
+
+def test_archived_email_is_not_reused(db):
+    old_id, fields = new_student(db)
+    run_sql(db, "UPDATE students SET created_at = %s WHERE id = %s", ('2000-01-01 00:00:00', old_id))
+    assert db.archive_students('2000-06-01 00:00:00', 100) == 1
+
+    try:
+        assert db.upsert_student(**fields) == ('archived', old_id)
+        assert db.upsert_student(**dict(fields, email=fields['email'].upper())) == ('archived', old_id)
+        counts = db.upsert_students([fields])
+        assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 1}
+        with pytest.raises(StudentArchived):
+            db.add_student(**fields)
+
+        other_id, other = new_student(db)
+        with pytest.raises(StudentArchived):
+            db.update_student(other_id, **dict(other, email=fields['email']))
+        assert db.get_student_by_id(other_id)['email'] == other['email']
+
+        matches = [s for s in db.get_all_students(include_archived=True) if s['email'] == fields['email']]
+        assert [s['id'] for s in matches] == [old_id]
+    finally:
+        run_sql(db, "DELETE FROM students_archive WHERE id = %s", (old_id,))
+
+
+def test_archive_cutoff_uses_database_clock(db):
+    old_id, _ = new_student(db)
+    recent_id, _ = new_student(db)
+    run_sql(db, "UPDATE students SET created_at = %s WHERE id = %s", ('2000-01-01 00:00:00', old_id))
+
+    # 20 years back from the database's own clock: only the backdated row qualifies
+    try:
+        assert db.archive_students(db.archive_cutoff(365 * 20), 100) == 1
+        assert db.get_student_by_id(old_id) is None
+        assert db.get_student_by_id(recent_id) is not None
+    finally:
+        run_sql(db, "DELETE FROM students_archive WHERE id = %s", (old_id,))
+
+
+def test_archive_check_holds_until_write_commits(tmp_path):
+    # SQLite only: needs two connections to one database file
+    path = str(tmp_path / 'students.db')
+    db = database_sqlite.Database(database=path)
+    db.init_database()
+    archiver = database_sqlite.Database(database=path)
+    archiver.get_connection().execute("PRAGMA busy_timeout = 50")
+    run_sql(db, "UPDATE students SET created_at = %s WHERE id = %s", ('2000-01-01 00:00:00', 2))
+
+    # A sync write has checked the archive but not written yet: the archive
+    # batch cannot move the student in between
+    with db._session(), db.transaction():
+        assert db._archived_id('jane.smith@example.com') is None
+        with pytest.raises(Exception, match='locked'):
+            archiver.archive_students('2000-06-01 00:00:00', 100)
+
+    assert archiver.archive_students('2000-06-01 00:00:00', 100) == 1
+    archiver.close_connection()
+    db.close_connection()
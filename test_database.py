@@ -0,0 +1,169 @@
+"""
+MySQL backend statement cache tests
+Uses a fake connection, so no MySQL server is needed
+"""
+
+import importlib.util
+import os
+import time
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+from mysql.connector import InterfaceError, ProgrammingError, errorcode
+
+# Loaded from its file: test_app.py swaps the 'database' module for SQLite
+_spec = importlib.util.spec_from_file_location(
+    'database_mysql', os.path.join(os.path.dirname(__file__), 'database.py'))
+database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(database)
+
+
+class FakeConnection:
+    """Connection whose prepared statements belong to the current session"""
+
+    def __init__(self):
+        self.connection_id = 1
+        self.pings = 0
+        self.lost = False
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if self.lost and reconnect:
+            self.reconnect()
+
+    def reconnect(self):
+        # Same object, new server session (as mysql-connector's reconnect() does)
+        self.connection_id += 1
+        self.lost = False
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.session = None
+        self.closed = False
+        self.executions = 0
+
+    def execute(self, operation, params=None):
+        if self.connection.lost:
+            raise InterfaceError(errno=errorcode.CR_SERVER_LOST, msg='Lost connection')
+        if self.session is None:
+            self.session = self.connection.connection_id
+        elif self.session != self.connection.connection_id:
+            raise ProgrammingError(errno=errorcode.ER_UNKNOWN_STMT_HANDLER,
+                                   msg='Unknown prepared statement handler')
+        self.executions += 1
+
+    column_names = ('id',)
+    rowcount = 1
+    lastrowid = 7
+
+    def fetchall(self):
+        return [(self.session,)]
+
+    def close(self):
+        self.closed = True
+
+
+def make_db(**kwargs):
+    db = database.Database('localhost', 'user', 'password', 'test', **kwargs)
+    db.connection = FakeConnection()
+    db._cursor_class = FakeCursor
+    db._last_used = time.monotonic()
+    return db
+
+
+def test_statements_are_cached_per_query():
+    db = make_db()
+    for _ in range(3):
+        with db._session():
+            db._fetchall('get_student_by_id', (1,))
+    cursor = db._statements['get_student_by_id']
+    assert cursor.executions == 3 and not cursor.closed
+    # Within ping_interval the connection is not pinged before each operation
+    assert db.connection.pings == 0
+
+
+def test_connection_is_checked_after_idling():
+    db = make_db(ping_interval=0)
+    time.sleep(0.001)
+    with db._session():
+        pass
+    assert db.connection.pings == 1
+
+
+def test_ping_after_reconnect_drops_stale_statements():
+    db = make_db()
+    with db._session():
+        db._fetchall('get_student_by_id', (1,))
+    assert db._statements
+
+    # Failover: the health check reconnects the same connection object
+    db.connection.lost = True
+    db.ping()
+    assert db.connection.connection_id == 2
+    assert not db._statements
+
+    with db._session():
+        assert db._fetchall('get_student_by_id', (1,)) == (('id',), [(2,)])
+
+
+def test_ping_keeps_statements_of_live_session():
+    db = make_db()
+    with db._session():
+        db._fetchall('get_student_by_id', (1,))
+    db.ping()
+    assert 'get_student_by_id' in db._statements
+
+
+def test_unknown_statement_handler_drops_cache_and_prepares_again():
+    db = make_db()
+    with db._session():
+        db._fetchall('get_student_by_id', (1,))
+        db._fetchall('search_students', ('%a%',) * 3)
+
+    # Reconnected behind the backend's back: cached statement ids are dead
+    db.connection.reconnect()
+    with db._session():
+        assert db._fetchall('get_student_by_id', (1,)) == (('id',), [(2,)])
+    assert list(db._statements) == ['get_student_by_id']
+
+
+def test_connection_error_checks_connection_before_next_operation():
+    db = make_db()
+    with db._session():
+        db._fetchall('get_student_by_id', (1,))
+
+    db.connection.lost = True
+    with pytest.raises(InterfaceError):
+        with db._session():
+            db._execute('delete_student', (1,))
+    assert not db._statements
+
+    # Not retried (the write may have run), but the next operation reconnects
+    with db._session():
+        assert db._fetchall('get_student_by_id', (1,)) == (('id',), [(2,)])
+    assert db.connection.pings == 1
+
+
+def test_statement_cache_is_lru_bounded():
+    db = make_db(statement_cache_size=2)
+    with db._session():
+        first = db._prepared_cursor('get_student_by_id')
+        db._prepared_cursor('search_students')
+        db._prepared_cursor('get_all_students')
+    assert list(db._statements) == ['search_students', 'get_all_students']
+    assert first.closed
+
+
+def test_statement_cache_size_zero_closes_every_statement():
+    db = make_db(statement_cache_size=0)
+    cursors = []
+    db._cursor_class = lambda connection: cursors.append(FakeCursor(connection)) or cursors[-1]
+    with db._session():
+        db._fetchall('get_student_by_id', (1,))
+        db._fetchall('get_student_by_id', (1,))
+        assert db._execute('delete_student', (1,)) == (1, 7)
+    assert not db._statements
+    assert len(cursors) == 3 and all(cursor.closed for cursor in cursors)
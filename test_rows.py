@@ -0,0 +1,90 @@
+"""
+Compact row and JSON encoding tests
+"""
+
+import datetime
+import json
+
+import pytest
+
+from rows import RowSet, RowSetJSONEncoder, record_default
+
+COLUMNS = ('id', 'name', 'email')
+
+
+def make_rowset(count):
+    return RowSet(COLUMNS, [(i, f'Student {i}', f's{i}@example.com') for i in range(count)])
+
+
+def as_dicts(rowset):
+    return [dict(zip(rowset.columns, row)) for row in rowset.rows]
+
+
+def dumps(obj, **kwargs):
+    return json.dumps(obj, cls=RowSetJSONEncoder, default=record_default, **kwargs)
+
+
+def test_record_access():
+    record = make_rowset(3)[1]
+    assert record.name == 'Student 1'
+    assert record['email'] == 's1@example.com'
+    assert dict(record) == {'id': 1, 'name': 'Student 1', 'email': 's1@example.com'}
+    assert not hasattr(record, '__dict__')
+
+
+def test_rowset_encodes_like_list_of_dicts():
+    for count in (0, 1, RowSetJSONEncoder.chunk_size, RowSetJSONEncoder.chunk_size * 2 + 3):
+        rowset = make_rowset(count)
+        envelope = {'success': True, 'data': rowset}
+        expected = {'success': True, 'data': as_dicts(rowset)}
+        assert dumps(envelope, sort_keys=True) == json.dumps(expected, sort_keys=True)
+        assert dumps(envelope) == json.dumps(expected)
+        assert dumps([rowset, 1]) == json.dumps([as_dicts(rowset), 1])
+
+
+def test_envelope_options_match_json_dumps():
+    rowset = make_rowset(3)
+    keys = {'b': rowset, 'a': 1, 2: 'two', 1.5: 'float', True: 'true', None: 'null'}
+    expected = dict(keys, b=as_dicts(rowset))
+
+    assert dumps(keys) == json.dumps(expected)
+    for indent in (None, 2):
+        sorted_keys = {'b': rowset, 'a': [rowset, {'d': 1, 'c': 2}]}
+        sorted_expected = {'b': as_dicts(rowset), 'a': [as_dicts(rowset), {'d': 1, 'c': 2}]}
+        assert (dumps(sorted_keys, sort_keys=True, indent=indent)
+                == json.dumps(sorted_expected, sort_keys=True, indent=indent))
+        assert dumps(keys, indent=indent) == json.dumps(expected, indent=indent)
+
+    skipped = {'data': rowset, (1, 2): 'tuple key', 'after': 1}
+    assert (dumps(skipped, skipkeys=True)
+            == json.dumps(dict(skipped, data=as_dicts(rowset)), skipkeys=True))
+    with pytest.raises(TypeError):
+        dumps(skipped)
+
+
+def test_record_and_default_fallback():
+    record = make_rowset(1)[0]
+    assert json.loads(dumps({'data': record})) == {'data': dict(record)}
+
+    def default(o):
+        if isinstance(o, datetime.date):
+            return o.isoformat()
+        return record_default(o)
+
+    rowset = RowSet(('id', 'created_at'), [(1, datetime.date(2020, 1, 2))])
+    encoded = json.dumps({'data': rowset}, cls=RowSetJSONEncoder, default=default)
+    assert json.loads(encoded) == {'data': [{'id': 1, 'created_at': '2020-01-02'}]}
+
+
+def test_api_returns_rows_as_objects(client):
+    data = client.get('/api/students').get_json()['data']
+    assert len(data) == 10
+    assert set(data[0]) == {'id', 'name', 'address', 'city', 'state', 'email', 'phone',
+                            'created_at', 'updated_at'}
+    assert client.get('/api/students/3').get_json()['data']['id'] == 3
+
+
+def test_templates_render_records(client):
+    response = client.get('/students')
+    assert response.status_code == 200
+    assert b'jane.smith@example.com' in response.data